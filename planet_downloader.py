@@ -15,11 +15,27 @@ import json
 import logging
 import argparse
 import requests
+from requests.adapters import HTTPAdapter
+import urllib3
+from urllib3.util.retry import Retry
 import datetime
 from pathlib import Path
 from dotenv import load_dotenv
 import subprocess
+import shutil
 import time
+import random
+import functools
+import threading
+import atexit
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# orjson is optional; it parses and serializes JSON considerably faster than
+# the standard library json module
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Configure logging
 logging.basicConfig(
@@ -45,6 +61,40 @@ if not API_KEY:
 BASE_URL = "https://api.planet.com/data/v1"
 SEARCH_URL = f"{BASE_URL}/quick-search"
 
+# Number of scenes requested per page of search results (the API maximum)
+SEARCH_PAGE_SIZE = 250
+
+# Shared HTTP session so TCP/TLS connections are pooled and reused across all
+# API calls. Connection errors, rate limits (429) and transient server errors
+# are retried by urllib3 with exponential backoff, honoring the Retry-After
+# header.
+RETRY_OPTIONS = {
+    "total": 5,
+    "backoff_factor": 1,
+    "status_forcelist": [429, 500, 502, 503, 504],
+    "allowed_methods": ["HEAD", "GET", "POST"],
+    "respect_retry_after_header": True,
+    "raise_on_status": False
+}
+try:
+    # Jitter keeps concurrent workers from retrying in lockstep (urllib3 2.x)
+    RETRY = Retry(backoff_jitter=0.5, **RETRY_OPTIONS)
+except TypeError:
+    RETRY = Retry(**RETRY_OPTIONS)
+
+SESSION = requests.Session()
+SESSION.auth = (API_KEY, "")
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=32,
+    pool_maxsize=32,
+    max_retries=RETRY
+))
+
+# Maximum number of API requests allowed in flight at once, to stay within
+# Planet's rate limits when scenes are processed concurrently
+MAX_CONCURRENT_REQUESTS = 5
+API_SEMAPHORE = threading.BoundedSemaphore(MAX_CONCURRENT_REQUESTS)
+
 # Default parameters
 # Set lat long here
 DEFAULT_LATITUDE = 37.355138
@@ -56,6 +106,79 @@ DEFAULT_ITEM_TYPE = "PSScene"
 # 4 Band (RGB+NIR) basic_analytic_4b
 # 8 Band (RGB+NIR+MIR) basic_analytic_8b
 DEFAULT_ASSET_TYPES = ["basic_analytic_8b", "ortho_visual"]
+DEFAULT_WORKERS = 8
+DEFAULT_ACTIVATION_TIMEOUT = 300
+
+# GDAL conversions are CPU and disk bound, so they run on a separate pool
+# sized to half the cores, leaving the download workers free for the network.
+# Each conversion gets an equal share of the cores for its compression threads
+# so concurrent conversions do not oversubscribe the CPU.
+COG_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+COG_THREADS = max(1, (os.cpu_count() or 2) // COG_WORKERS)
+
+# Scene properties saved to each scene's metadata file
+METADATA_FIELDS = (
+    "acquired",
+    "cloud_cover",
+    "sun_azimuth",
+    "sun_elevation",
+    "view_angle",
+    "satellite_id",
+    "ground_control",
+    "item_type",
+    "quality_category"
+)
+
+# Status file tracking activated and downloaded assets. It is read once into
+# _STATUS and shared by the worker threads, so every mutation and write goes
+# through this lock.
+STATUS_FILE = "planet_status.json"
+_STATUS = None
+_STATUS_LOCK = threading.RLock()
+
+# Intermediate status changes are batched and written at most this often
+STATUS_FLUSH_INTERVAL = 5
+_STATUS_DIRTY = False
+_STATUS_TIMER = None
+
+# Asset listings are shared by every asset type of a scene, so they are cached
+# per scene. Entries expire because the links they contain are signed.
+ASSETS_CACHE_TTL = 600
+_ASSETS_CACHE = {}
+_ASSETS_CACHE_LOCK = threading.Lock()
+
+# Output paths computed per scene, and directories already created, so
+# repeated lookups from worker threads skip the path joins and mkdir calls
+_SCENE_PATHS = {}
+_CREATED_DIRS = set()
+_SAVED_METADATA = set()
+_PATHS_LOCK = threading.Lock()
+
+# Buffer size used when streaming downloads to disk
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+# Large downloads are split into byte ranges fetched over parallel
+# connections. Completed ranges are tracked in a .part file next to the
+# download so an interrupted transfer resumes instead of starting over.
+DOWNLOAD_SEGMENTS = 4
+MIN_SEGMENT_SIZE = 16 * 1024 * 1024
+
+# Number of received chunks gathered into a single vectored write
+DOWNLOAD_WRITE_BATCH = 4
+
+
+def json_loads(data):
+    """Parse JSON from bytes or str, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj, indent=False):
+    """Serialize an object to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
 
 
 def parse_args():
@@ -110,6 +233,18 @@ def parse_args():
         action="store_true",
         help="Only request activation for assets without waiting or downloading"
     )
+    parser.add_argument(
+        "--activation-timeout",
+        type=int,
+        default=DEFAULT_ACTIVATION_TIMEOUT,
+        help=f"Seconds to wait for each asset to become active after its activation request (default: {DEFAULT_ACTIVATION_TIMEOUT})"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of scene/asset pairs to process in parallel (default: {DEFAULT_WORKERS})"
+    )
     
     return parser.parse_args()
 
@@ -160,343 +295,631 @@ def build_search_request(start_date, end_date, latitude, longitude, item_type, m
     return search_request
 
 
+def api_request(method, url, **kwargs):
+    """Send a request through the shared session, limiting concurrent API calls."""
+    with API_SEMAPHORE:
+        return SESSION.request(method, url, **kwargs)
+
+
 def search_planet_imagery(search_request):
-    """Search for Planet imagery using the search request."""
+    """Search for Planet imagery using the search request, yielding scenes page by page."""
     logger.info("Searching for Planet imagery...")
     
     # Make the search request
-    response = requests.post(
+    response = api_request(
+        "POST",
         SEARCH_URL,
-        auth=(API_KEY, ""),
+        params={"_page_size": SEARCH_PAGE_SIZE},
         json=search_request
     )
     
-    if response.status_code != 200:
-        logger.error(f"Error searching for imagery: {response.text}")
-        return None
-    
-    # Parse the response
-    search_result = response.json()
-    features = search_result.get("features", [])
-    logger.info(f"Found {len(features)} scenes matching the criteria")
+    scene_count = 0
+    while True:
+        if response.status_code != 200:
+            logger.error(f"Error searching for imagery: {response.text}")
+            return
+        
+        # Parse the response
+        search_result = json_loads(response.content)
+        features = search_result.get("features", [])
+        scene_count += len(features)
+        yield from features
+        
+        # Follow the link to the next page until the results are exhausted
+        next_url = search_result.get("_links", {}).get("_next")
+        if not features or not next_url:
+            break
+        response = api_request("GET", next_url)
     
-    return features
+    logger.info(f"Found {scene_count} scenes matching the criteria")
+
+
+def retry_with_backoff(max_attempts=3, base_delay=2, max_delay=60):
+    """Retry a function failing with a request or I/O error, using exponential backoff with jitter."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(1, max_attempts + 1):
+                try:
+                    return func(*args, **kwargs)
+                except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+                    if attempt == max_attempts:
+                        raise
+                    delay = min(max_delay, base_delay * 2 ** (attempt - 1)) + random.uniform(0, base_delay)
+                    logger.warning(f"{func.__name__} failed (attempt {attempt}/{max_attempts}): {str(e)}. Retrying in {delay:.1f} seconds...")
+                    time.sleep(delay)
+        return wrapper
+    return decorator
 
 
 def get_asset_activation_status(asset_url):
     """Check the activation status of an asset."""
-    max_retries = 3
-    retry_delay = 2
+    try:
+        response = api_request("GET", asset_url, timeout=30)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Request failed: {str(e)}")
+        return None
     
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(
-                asset_url,
-                auth=(API_KEY, ""),
-                timeout=30
-            )
-            
-            if response.status_code == 200:
-                return response.json()
-            
-            if response.status_code == 429:  # Rate limit
-                logger.warning(f"Rate limit hit, waiting {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-                continue
-                
-            logger.error(f"Error checking asset status (attempt {attempt + 1}/{max_retries}): {response.text}")
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
-        
-        if attempt < max_retries - 1:
-            time.sleep(retry_delay)
+    if response.status_code != 200:
+        logger.error(f"Error checking asset status: {response.text}")
+        return None
     
-    return None
+    return json_loads(response.content)
 
 
 def activate_asset(asset_url):
     """Activate an asset for download."""
-    max_retries = 3
-    retry_delay = 2
-    
     logger.info(f"Activating asset with URL: {asset_url}")
     
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(
-                asset_url,
-                auth=(API_KEY, ""),
-                timeout=30
-            )
-            
-            if response.status_code in (202, 204):
-                logger.info("Asset activation request successful")
-                return True
-            
-            if response.status_code == 429:  # Rate limit
-                logger.warning(f"Rate limit hit, waiting {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-                continue
-                
-            logger.error(f"Error activating asset (attempt {attempt + 1}/{max_retries}): {response.text}")
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
-        
-        if attempt < max_retries - 1:
-            time.sleep(retry_delay)
+    try:
+        response = api_request("POST", asset_url, timeout=30)
+    except requests.exceptions.RequestException as e:
+        logger.error(f"Request failed: {str(e)}")
+        return False
+    
+    if response.status_code not in (202, 204):
+        logger.error(f"Error activating asset: {response.text}")
+        return False
     
-    return False
+    logger.info("Asset activation request successful")
+    return True
 
 
-def wait_for_asset_activation(asset_url, timeout=300, check_interval=5):
-    """Wait for an asset to be activated."""
-    logger.info("Waiting for asset activation...")
-    start_time = time.time()
+def wait_for_asset_activations(jobs, executor, timeout=DEFAULT_ACTIVATION_TIMEOUT, initial_interval=2, max_interval=30):
+    """Poll all pending assets together, yielding each job as its asset becomes active.
     
-    # Use the provided asset URL directly for status checking
-    # This should be the self_link from the asset data
-    
-    # Extract asset key from the URL to update status
-    # URL format: .../item-types/{item_type}/items/{item_id}/assets/{asset_type}
-    url_parts = asset_url.split('/')
-    if len(url_parts) >= 8:
-        item_id = url_parts[-4]
-        asset_type = url_parts[-1]
-        asset_key = f"{item_id}_{asset_type}"
-    else:
-        asset_key = None
-        logger.warning(f"Could not extract asset key from URL: {asset_url}")
+    Each asset gets its own timeout, counted from its activation request
+    (or from the start of polling for assets activated by an earlier run).
+    The polling interval starts short so quick activations are picked up
+    promptly, then grows by half each round up to max_interval to limit
+    the number of status requests for slow ones.
+    """
+    logger.info(f"Waiting for activation of {len(jobs)} assets...")
+    start_time = time.time()
+    pending = list(jobs)
+    deadlines = {
+        job["asset_key"]: (job["activation_requested_at"] or start_time) + timeout
+        for job in pending
+    }
+    check_interval = initial_interval
     
-    while time.time() - start_time < timeout:
-        asset_status = get_asset_activation_status(asset_url)
-        
-        if not asset_status:
-            return False
+    while pending:
+        # Check every pending asset concurrently so activation latencies overlap
+        statuses = executor.map(
+            lambda job: get_asset_activation_status(job["self_link"]),
+            pending
+        )
         
-        if asset_status["status"] == "active":
-            logger.info("Asset is now active and ready for download")
-            
-            # Update the status in the status file if we have the asset key
-            if asset_key:
-                status = load_status()
-                if asset_key in status["activated_scenes"]:
-                    status["activated_scenes"][asset_key] = "active"
-                    save_status(status)
-                    logger.info(f"Updated status for {asset_key} to 'active'")
+        still_pending = []
+        for job, asset_status in zip(pending, statuses):
+            if not asset_status:
+                logger.error(f"Could not get activation status for {job['asset_key']}")
+                continue
             
-            return True
+            if asset_status["status"] == "active":
+                if "location" not in asset_status:
+                    logger.error(f"Asset {job['asset_key']} is active but has no download URL")
+                    continue
+                
+                logger.info(f"Asset {job['asset_key']} is now active and ready for download")
+                update_status("activated_scenes", job["asset_key"], "active")
+                yield dict(job, download_url=asset_status["location"])
+            else:
+                still_pending.append(job)
         
-        logger.info(f"Asset status: {asset_status['status']}. Waiting...")
-        time.sleep(check_interval)
+        now = time.time()
+        pending = []
+        for job in still_pending:
+            if deadlines[job["asset_key"]] <= now:
+                logger.error(f"Asset {job['asset_key']} activation timed out after {timeout} seconds")
+            else:
+                pending.append(job)
+        
+        if not pending:
+            break
+        
+        # Wake up early if an asset reaches its deadline before the next check
+        next_deadline = min(deadlines[job["asset_key"]] for job in pending)
+        sleep_time = min(check_interval, next_deadline - now)
+        logger.info(f"{len(pending)} assets still activating. Checking again in {sleep_time:.0f} seconds...")
+        time.sleep(sleep_time)
+        check_interval = min(check_interval * 1.5, max_interval)
+
+
+def get_download_size(download_url):
+    """Return the size of a download if it can be fetched in byte ranges, otherwise None."""
+    if not hasattr(os, "pwrite"):
+        return None
+    
+    response = api_request("HEAD", download_url, allow_redirects=True, timeout=60)
+    if response.status_code != 200 or response.headers.get("Accept-Ranges") != "bytes":
+        return None
     
-    logger.error(f"Asset activation timed out after {timeout} seconds")
-    return False
+    size = int(response.headers.get("Content-Length", 0))
+    if size < MIN_SEGMENT_SIZE:
+        return None
+    
+    return size
 
 
-def download_asset(asset_url, output_path):
-    """Download an activated asset."""
-    logger.info(f"Downloading asset to {output_path}...")
+def split_byte_ranges(size):
+    """Split a download of the given size into inclusive (start, end) byte ranges."""
+    count = max(1, min(DOWNLOAD_SEGMENTS, size // MIN_SEGMENT_SIZE))
+    segment_size = -(-size // count)  # Ceiling division
+    return [
+        (start, min(size, start + segment_size) - 1)
+        for start in range(0, size, segment_size)
+    ]
+
+
+def write_buffers_at(fd, buffers, offset):
+    """Write a list of buffers to a file at an offset, in one system call where possible."""
+    total = sum(len(buffer) for buffer in buffers)
+    written = os.pwritev(fd, buffers, offset) if hasattr(os, "pwritev") else 0
     
-    # Get the download URL
-    status = get_asset_activation_status(asset_url)
-    if not status or status["status"] != "active" or "location" not in status:
-        logger.error("Asset is not active or download URL not available")
-        return False
+    # Finish any remainder left by a short or unavailable vectored write
+    if written < total:
+        data = memoryview(b"".join(buffers))
+        while written < total:
+            written += os.pwrite(fd, data[written:], offset + written)
     
-    download_url = status["location"]
+    return total
+
+
+def fetch_byte_range(download_url, fd, start, end):
+    """Download one byte range and write it to the file at its offset."""
+    response = api_request(
+        "GET",
+        download_url,
+        headers={"Range": f"bytes={start}-{end}"},
+        stream=True,
+        timeout=60
+    )
+    
+    if response.status_code != 206:
+        raise requests.exceptions.HTTPError(
+            f"Range request for bytes {start}-{end} returned status code {response.status_code}",
+            response=response
+        )
+    
+    # Gather several chunks per write so the disk sees fewer, larger writes
+    # while the socket keeps receiving
+    offset = start
+    buffers = []
+    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+        buffers.append(chunk)
+        if len(buffers) == DOWNLOAD_WRITE_BATCH:
+            offset += write_buffers_at(fd, buffers, offset)
+            buffers = []
+    if buffers:
+        offset += write_buffers_at(fd, buffers, offset)
     
-    # Download the asset
-    max_retries = 3
-    retry_delay = 2
+    if offset != end + 1:
+        raise IOError(f"Incomplete range {start}-{end}: received {offset - start} bytes")
+
+
+def download_in_segments(download_url, output_path, size):
+    """Download a file as parallel byte-range segments, resuming a partial download."""
+    part_path = f"{output_path}.part"
+    byte_ranges = split_byte_ranges(size)
+    completed = set()
     
-    for attempt in range(max_retries):
+    # Reuse segments finished by an earlier attempt for the same file. A
+    # sidecar that cannot be read or describes another file is ignored and
+    # the download starts over.
+    if os.path.exists(part_path) and os.path.exists(output_path):
         try:
-            response = requests.get(download_url, stream=True, timeout=60)
-            
-            if response.status_code == 200:
-                # Save the asset to disk
-                with open(output_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                
-                logger.info(f"Asset downloaded successfully to {output_path}")
-                return True
-            
-            if response.status_code == 429:  # Rate limit
-                logger.warning(f"Rate limit hit, waiting {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-                continue
-            
-            logger.error(f"Error downloading asset (attempt {attempt + 1}/{max_retries}): Status code {response.status_code}")
-            
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Download request failed (attempt {attempt + 1}/{max_retries}): {str(e)}")
+            with open(part_path, "rb") as f:
+                part = json_loads(f.read())
+            if part.get("size") == size:
+                completed = {index for index in part["completed"] if 0 <= index < len(byte_ranges)}
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable resume file {part_path}: {str(e)}")
+            completed = set()
         
-        if attempt < max_retries - 1:
-            logger.info(f"Retrying download in {retry_delay} seconds...")
-            time.sleep(retry_delay)
-            retry_delay *= 2  # Exponential backoff
+        if completed:
+            logger.info(f"Resuming download of {output_path}: {len(completed)}/{len(byte_ranges)} segments already complete")
     
-    logger.error("All download attempts failed")
-    return False
+    if not completed:
+        with open(output_path, "wb") as f:
+            f.truncate(size)
+    
+    part_lock = threading.Lock()
+    fd = os.open(output_path, os.O_WRONLY)
+    
+    def fetch_segment(index):
+        start, end = byte_ranges[index]
+        fetch_byte_range(download_url, fd, start, end)
+        with part_lock:
+            completed.add(index)
+            
+            # Swap the sidecar in atomically so an interrupted write cannot
+            # leave it truncated
+            tmp_path = f"{part_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(json_dumps({"size": size, "completed": sorted(completed)}))
+            os.replace(tmp_path, part_path)
+    
+    try:
+        remaining = [index for index in range(len(byte_ranges)) if index not in completed]
+        if remaining:
+            with ThreadPoolExecutor(max_workers=len(remaining)) as executor:
+                # Consume the results so the first failed segment is raised
+                list(executor.map(fetch_segment, remaining))
+    finally:
+        os.close(fd)
+    
+    if os.path.exists(part_path):
+        os.remove(part_path)
 
 
+@retry_with_backoff()
+def fetch_file(download_url, output_path):
+    """Fetch a file to disk, in parallel byte ranges when the server supports them."""
+    size = get_download_size(download_url)
+    if size:
+        download_in_segments(download_url, output_path, size)
+        return
+    
+    response = api_request("GET", download_url, stream=True, timeout=60)
+    response.raise_for_status()
+    
+    # Stream the file to disk in large blocks, decoding any transfer
+    # encoding on the fly. Write to a temporary file so a failed transfer
+    # never leaves a partial file at the final path.
+    response.raw.decode_content = True
+    tmp_path = f"{output_path}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            shutil.copyfileobj(response.raw, f, length=DOWNLOAD_CHUNK_SIZE)
+    except urllib3.exceptions.HTTPError as e:
+        # Reading the raw stream bypasses requests' wrapping of urllib3
+        # errors, so convert them to let the download be retried
+        raise requests.exceptions.ConnectionError(e) from e
+    os.replace(tmp_path, output_path)
+
+
+def download_asset(download_url, output_path):
+    """Download an activated asset from its download URL."""
+    logger.info(f"Downloading asset to {output_path}...")
+    
+    try:
+        fetch_file(download_url, output_path)
+    except (requests.exceptions.RequestException, urllib3.exceptions.HTTPError, OSError) as e:
+        logger.error(f"All download attempts failed: {str(e)}")
+        return False
+    
+    logger.info(f"Asset downloaded successfully to {output_path}")
+    return True
 
 
 def load_status():
     """Load the status of activated and downloaded scenes from the status file."""
-    status_file = "planet_status.json"
-    if os.path.exists(status_file):
-        with open(status_file, "r") as f:
-            return json.load(f)
+    if os.path.exists(STATUS_FILE):
+        with open(STATUS_FILE, "rb") as f:
+            return json_loads(f.read())
     return {"activated_scenes": {}, "downloaded_scenes": {}}
 
 
-def save_status(status):
+def get_status():
+    """Return the in-memory status, loading it from the status file on first use."""
+    global _STATUS
+    with _STATUS_LOCK:
+        if _STATUS is None:
+            _STATUS = load_status()
+        return _STATUS
+
+
+def save_status():
     """Save the status of activated and downloaded scenes to the status file."""
-    status_file = "planet_status.json"
-    with open(status_file, "w") as f:
-        json.dump(status, f, indent=4)
+    global _STATUS_DIRTY
+    with _STATUS_LOCK:
+        if _STATUS is None:
+            return
+        
+        # Write to a temporary file and swap it in so an interrupted write
+        # never leaves a truncated status file behind
+        tmp_file = f"{STATUS_FILE}.tmp"
+        with open(tmp_file, "wb") as f:
+            f.write(json_dumps(_STATUS))
+        os.replace(tmp_file, STATUS_FILE)
+        _STATUS_DIRTY = False
 
 
-def save_metadata(scene, output_dir):
-    """Save metadata for a scene to a JSON file."""
+def flush_status():
+    """Save the status file if it has unsaved changes."""
+    global _STATUS_TIMER
+    with _STATUS_LOCK:
+        _STATUS_TIMER = None
+        if _STATUS_DIRTY:
+            save_status()
+
+
+def update_status(section, asset_key, value, flush=True):
+    """Set a single entry of the status.
+    
+    The status file is written immediately when flush is True. Otherwise
+    the change is batched with others and written within
+    STATUS_FLUSH_INTERVAL seconds, or at exit.
+    """
+    global _STATUS_DIRTY, _STATUS_TIMER
+    with _STATUS_LOCK:
+        get_status()[section][asset_key] = value
+        if flush:
+            save_status()
+            return
+        
+        _STATUS_DIRTY = True
+        if _STATUS_TIMER is None:
+            _STATUS_TIMER = threading.Timer(STATUS_FLUSH_INTERVAL, flush_status)
+            _STATUS_TIMER.daemon = True
+            _STATUS_TIMER.start()
+
+
+atexit.register(flush_status)
+
+
+def ensure_dir(path):
+    """Create a directory (and parents) unless this run already created it."""
+    with _PATHS_LOCK:
+        if path in _CREATED_DIRS:
+            return
+    os.makedirs(path, exist_ok=True)
+    with _PATHS_LOCK:
+        _CREATED_DIRS.add(path)
+
+
+def get_scene_paths(scene, output_dir):
+    """Return the output paths for a scene, computing them once per scene."""
     scene_id = scene["id"]
-    acquired_date = scene["properties"]["acquired"].split("T")[0]
+    with _PATHS_LOCK:
+        paths = _SCENE_PATHS.get(scene_id)
+    if paths is not None:
+        return paths
     
-    # Extract year from the acquired date
-    year = acquired_date.split("-")[0]
+    # The acquired timestamp is ISO 8601 (YYYY-MM-DDTHH:MM:SS...), so the
+    # date and year are fixed-width prefixes
+    acquired_date = scene["properties"]["acquired"][:10]
+    year = acquired_date[:4]
     
-    # Create output directory structure: /output_dir/YYYY/YYYY-MM-DD/
-    year_dir = os.path.join(output_dir, year)
-    date_dir = os.path.join(year_dir, acquired_date)
-    os.makedirs(date_dir, exist_ok=True)
+    # Output directory structure: /output_dir/YYYY/YYYY-MM-DD/
+    date_dir = os.path.join(output_dir, year, acquired_date)
+    paths = {
+        "date_dir": date_dir,
+        "metadata_file": os.path.join(date_dir, f"{scene_id}_metadata.json")
+    }
+    
+    with _PATHS_LOCK:
+        _SCENE_PATHS[scene_id] = paths
+    return paths
+
+
+def save_metadata(scene, output_dir):
+    """Save metadata for a scene to a JSON file, once per scene per run."""
+    scene_id = scene["id"]
+    paths = get_scene_paths(scene, output_dir)
     
-    # Create metadata file path
-    metadata_file = os.path.join(date_dir, f"{scene_id}_metadata.json")
+    # Every asset type of a scene shares the same metadata file
+    with _PATHS_LOCK:
+        if scene_id in _SAVED_METADATA:
+            return paths["date_dir"]
+        _SAVED_METADATA.add(scene_id)
+    
+    date_dir = paths["date_dir"]
+    metadata_file = paths["metadata_file"]
+    ensure_dir(date_dir)
     
     # Extract relevant metadata from scene properties
-    metadata = {
-        "id": scene_id,
-        "acquired": scene["properties"]["acquired"],
-        "cloud_cover": scene["properties"]["cloud_cover"],
-        "sun_azimuth": scene["properties"].get("sun_azimuth"),
-        "sun_elevation": scene["properties"].get("sun_elevation"),
-        "view_angle": scene["properties"].get("view_angle"),
-        "satellite_id": scene["properties"].get("satellite_id"),
-        "ground_control": scene["properties"].get("ground_control"),
-        "item_type": scene["properties"].get("item_type"),
-        "quality_category": scene["properties"].get("quality_category")
-    }
+    props = scene["properties"]
+    metadata = {"id": scene_id}
+    metadata.update({field: props.get(field) for field in METADATA_FIELDS})
     
     # Save metadata to file
-    with open(metadata_file, "w") as f:
-        json.dump(metadata, f, indent=4)
+    with open(metadata_file, "wb") as f:
+        f.write(json_dumps(metadata, indent=True))
     
     logger.info(f"Saved metadata to {metadata_file}")
     
     return date_dir  # Return the date directory path for use in process_scene
 
 
-def process_scene(scene, asset_type, output_dir, activate_only=False):
-    """Process a single scene and asset type: activate, download, and convert to COG."""
+def fetch_assets(item_type, scene_id):
+    """Get the available assets for a scene, reusing a recent listing if cached."""
+    with _ASSETS_CACHE_LOCK:
+        entry = _ASSETS_CACHE.get(scene_id)
+        if entry is None:
+            # Drop expired listings that no worker is fetching before adding
+            # a new one, so the cache does not grow with every scene in a run
+            now = time.time()
+            for cached_id, cached in list(_ASSETS_CACHE.items()):
+                if now - cached["fetched_at"] >= ASSETS_CACHE_TTL and not cached["lock"].locked():
+                    del _ASSETS_CACHE[cached_id]
+            
+            entry = {"lock": threading.Lock(), "fetched_at": 0, "assets": None}
+            _ASSETS_CACHE[scene_id] = entry
+    
+    # Hold the per-scene lock while fetching so concurrent workers for other
+    # asset types of the same scene wait for this listing instead of refetching
+    with entry["lock"]:
+        if entry["assets"] is not None and time.time() - entry["fetched_at"] < ASSETS_CACHE_TTL:
+            return entry["assets"]
+        
+        assets_url = f"{BASE_URL}/item-types/{item_type}/items/{scene_id}/assets"
+        response = api_request("GET", assets_url)
+        
+        if response.status_code != 200:
+            logger.error(f"Error getting assets for scene {scene_id}: {response.text}")
+            return None
+        
+        entry["assets"] = json_loads(response.content)
+        entry["fetched_at"] = time.time()
+        return entry["assets"]
+
+
+def process_scene(scene, asset_type, output_dir):
+    """Request activation for a single scene and asset type.
+    
+    Returns a job dict describing the asset for the polling and download
+    stages, or None if the asset could not be activated. Assets already
+    downloaded by an earlier run are returned with "downloaded" set and
+    without any API calls.
+    """
     scene_id = scene["id"]
-    acquired_date = scene["properties"]["acquired"].split("T")[0]
+    date_dir = get_scene_paths(scene, output_dir)["date_dir"]
+    raw_tif_path = os.path.join(date_dir, f"{scene_id}_{asset_type}.tif")
     
-    # Save metadata for the scene and get the date directory path
-    date_dir = save_metadata(scene, output_dir)
+    # Create a unique key for tracking this specific asset
+    asset_key = f"{scene_id}_{asset_type}"
+    job = {
+        "scene_id": scene_id,
+        "asset_type": asset_type,
+        "asset_key": asset_key,
+        "date_dir": date_dir,
+        "raw_tif_path": raw_tif_path,
+        "cog_path": os.path.join(date_dir, f"{scene_id}_{asset_type}_cog.tif"),
+        "activation_requested_at": None,
+        "downloaded": False
+    }
     
     # Load current status
-    status = load_status()
+    status = get_status()
     
-    # Get the asset URL
-    assets_url = f"{BASE_URL}/item-types/{scene['properties']['item_type']}/items/{scene_id}/assets"
-    
-    # Get available assets
-    response = requests.get(
-        assets_url,
-        auth=(API_KEY, "")
-    )
+    # Skip assets finished by an earlier run before making any API calls
+    if asset_key in status["downloaded_scenes"] and os.path.exists(raw_tif_path):
+        logger.info(f"Asset {asset_key} already downloaded, skipping...")
+        job["downloaded"] = True
+        return job
     
-    if response.status_code != 200:
-        logger.error(f"Error getting assets for scene {scene_id}: {response.text}")
-        return False
+    # Save metadata for the scene
+    save_metadata(scene, output_dir)
     
-    assets = response.json()
+    # Get available assets
+    assets = fetch_assets(scene["properties"]["item_type"], scene_id)
+    if assets is None:
+        return None
     
     if asset_type not in assets:
         logger.error(f"Asset type '{asset_type}' not available for scene {scene_id}")
-        return False
+        return None
     
     # Get asset data and links
     asset_data = assets[asset_type]
     if "_links" not in asset_data:
         logger.error(f"Asset data for {scene_id} does not contain _links. Asset data: {json.dumps(asset_data)}")
-        return False
+        return None
         
     links = asset_data["_links"]
     if "activate" not in links or "_self" not in links:
         logger.error(f"Asset links for {scene_id} missing required links. Links: {json.dumps(links)}")
-        return False
+        return None
         
     activation_link = links["activate"]
     self_link = links["_self"]
     
     logger.info(f"Found activation link for {asset_type}: {activation_link}")
     
-    # Create a unique key for tracking this specific asset
-    asset_key = f"{scene_id}_{asset_type}"
-    
     # Check if already activated
     if asset_key in status["activated_scenes"]:
         logger.info(f"Asset {asset_key} already activated, skipping activation...")
-        if not activate_only:
-            if not wait_for_asset_activation(self_link):
-                return False
+    elif activate_asset(activation_link):
+        job["activation_requested_at"] = time.time()
+        # An interrupted run simply re-requests activation, so this
+        # intermediate state does not need to be written right away
+        update_status("activated_scenes", asset_key, "activating", flush=False)
+        logger.info(f"Asset {asset_key} activation requested successfully")
     else:
-        # Activate the asset
-        if activate_asset(activation_link):
-            status["activated_scenes"][asset_key] = "activating"
-            save_status(status)
-            logger.info(f"Asset {asset_key} activation requested successfully")
-        else:
-            return False
-        
-        # Only wait for activation if not in activate-only mode
-        if not activate_only:
-            if not wait_for_asset_activation(self_link):
-                return False
+        return None
     
-    # If in activate-only mode, return here
-    if activate_only:
+    job["self_link"] = self_link
+    return job
+
+
+def convert_to_cog(raw_tif_path, cog_path):
+    """Convert a downloaded GeoTIFF to a Cloud Optimized GeoTIFF using GDAL."""
+    if os.path.exists(cog_path):
+        logger.info(f"COG {cog_path} already exists, skipping conversion...")
         return True
     
-    # Check if already downloaded
-    raw_tif_path = os.path.join(date_dir, f"{scene_id}_{asset_type}.tif")
-    if asset_key in status["downloaded_scenes"] and os.path.exists(raw_tif_path):
-        logger.info(f"Asset {asset_key} already downloaded, skipping download...")
-    else:
-        # Download the asset
-        if download_asset(self_link, raw_tif_path):
-            status["downloaded_scenes"][asset_key] = True
-            save_status(status)
-        else:
-            return False
+    logger.info(f"Converting {raw_tif_path} to COG...")
     
-    # Convert to COG
-    cog_path = os.path.join(date_dir, f"{scene_id}_{asset_type}_cog.tif")
+    # Write to a temporary file so an interrupted conversion is never
+    # mistaken for a finished COG
+    tmp_path = f"{cog_path}.tmp"
+    try:
+        subprocess.run(
+            [
+                "gdal_translate",
+                "-of", "COG",
+                "-co", "COMPRESS=DEFLATE",
+                "-co", f"NUM_THREADS={COG_THREADS}",
+                raw_tif_path,
+                tmp_path
+            ],
+            check=True,
+            capture_output=True,
+            text=True
+        )
+    except FileNotFoundError:
+        logger.error("gdal_translate not found. Make sure GDAL command-line tools are installed.")
+        return False
+    except subprocess.CalledProcessError as e:
+        logger.error(f"Error converting {raw_tif_path} to COG: {e.stderr.strip()}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
     
+    os.replace(tmp_path, cog_path)
+    logger.info(f"Saved COG to {cog_path}")
     return True
 
 
+def download_scene_asset(job, cog_executor):
+    """Download an active asset for a scene and queue its conversion to COG.
+    
+    Returns the future of the COG conversion, or None if the download failed.
+    """
+    if not download_asset(job["download_url"], job["raw_tif_path"]):
+        return None
+    
+    update_status("downloaded_scenes", job["asset_key"], True)
+    
+    # Convert to COG on the conversion pool so this worker can move on to
+    # the next download
+    return cog_executor.submit(convert_to_cog, job["raw_tif_path"], job["cog_path"])
+
+
+def iter_completed(futures):
+    """Yield (label, result) for each future as it completes, logging unexpected errors."""
+    for future in as_completed(futures):
+        try:
+            yield futures[future], future.result()
+        except Exception as e:
+            logger.error(f"Unexpected error processing {futures[future]}: {str(e)}")
+
+
 def display_status_summary():
     """Display a summary of activated and downloaded scenes."""
-    status = load_status()
+    status = get_status()
     
     logger.info("===== Planet Products Status Summary =====")
     
@@ -547,22 +970,62 @@ def main():
         args.max_cloud_cover
     )
     
-    # Search for imagery
-    features = search_planet_imagery(search_request)
-    if not features:
+    # Stage 1: request activation for every scene/asset pair, starting as
+    # soon as each page of search results arrives. The pairs are independent
+    # and dominated by network latency, so run them in parallel.
+    scene_count = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {}
+        for scene in search_planet_imagery(search_request):
+            scene_count += 1
+            for asset_type in args.asset_types:
+                logger.info(f"Queueing asset type {asset_type} for scene {scene['id']}...")
+                future = executor.submit(process_scene, scene, asset_type, str(output_dir))
+                futures[future] = f"{scene['id']}_{asset_type}"
+        
+        jobs = [job for _, job in iter_completed(futures) if job]
+    
+    if not scene_count:
         logger.error("No imagery found matching the criteria")
         return
     
-    # Process each scene and each asset type
-    successful_assets = 0
-    total_assets = len(features) * len(args.asset_types)
+    total_assets = scene_count * len(args.asset_types)
+    
+    # Assets downloaded by an earlier run need no further downloading
+    successful_assets = sum(1 for job in jobs if job["downloaded"])
+    pending_jobs = [job for job in jobs if not job["downloaded"]]
     
-    for scene in features:
-        logger.info(f"Processing scene {scene['id']}...")
-        for asset_type in args.asset_types:
-            logger.info(f"Processing asset type {asset_type} for scene {scene['id']}...")
-            if process_scene(scene, asset_type, str(output_dir), args.activate_only):
-                successful_assets += 1
+    if args.activate_only:
+        successful_assets += len(pending_jobs)
+    else:
+        cog_futures = {}
+        with ThreadPoolExecutor(max_workers=COG_WORKERS) as cog_executor:
+            # Convert earlier downloads that do not have a COG yet
+            for job in jobs:
+                if job["downloaded"] and not os.path.exists(job["cog_path"]):
+                    future = cog_executor.submit(convert_to_cog, job["raw_tif_path"], job["cog_path"])
+                    cog_futures[future] = job["asset_key"]
+            
+            if pending_jobs:
+                # Stages 2 and 3: poll all pending activations together and
+                # start each download as soon as its asset becomes active.
+                # Each finished download is queued for COG conversion.
+                with ThreadPoolExecutor(max_workers=args.workers) as download_executor:
+                    download_futures = {}
+                    with ThreadPoolExecutor(max_workers=args.workers) as poll_executor:
+                        for job in wait_for_asset_activations(pending_jobs, poll_executor, args.activation_timeout):
+                            future = download_executor.submit(download_scene_asset, job, cog_executor)
+                            download_futures[future] = job["asset_key"]
+                    
+                    for asset_key, cog_future in iter_completed(download_futures):
+                        if cog_future:
+                            successful_assets += 1
+                            cog_futures[cog_future] = asset_key
+            
+            converted_assets = sum(1 for _, converted in iter_completed(cog_futures) if converted)
+        
+        if cog_futures:
+            logger.info(f"Converted {converted_assets} out of {len(cog_futures)} assets to COG")
     
     if args.activate_only:
         logger.info("Activation requests completed. Run the script again later without --activate-only to download the assets.")